@@ -0,0 +1,229 @@
+import gzip
+import json
+import re
+import sys
+from array import array
+from dataclasses import dataclass
+
+BATCH_FORMAT_VERSION = 2
+MAX_SECTION_LABELS = 1 << 16  # section label ids are stored as array('H')
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+# span.cit looks like "Environ Health Perspect. 2021 Mar 5;129(3):037001."
+date_pattern = re.compile(r'\b((?:19|20)\d{2})(?:\s+([A-Za-z]{3})[a-z]*\.?(?:\s+(\d{1,2}))?)?\b')
+
+
+@dataclass(slots=True)
+class SectionRecord:
+    label: str
+    text: str
+
+    def __post_init__(self):
+        self.label = sys.intern(self.label)
+
+
+@dataclass(slots=True)
+class ArticleRecord:
+    key: str  # where the article came from, e.g. the raw file's path relative to the corpus
+    title: str
+    url: str
+    authors: tuple
+    publication_date: str  # "YYYY", "YYYY-MM" or "YYYY-MM-DD"; "" when unknown
+    sections: tuple
+
+    def section(self, label):
+        for section in self.sections:
+            if section.label == label:
+                return section.text
+        return ""
+
+
+def parse_authors(authors):
+    """Return a tuple of author names from a list of names or a ", " joined string."""
+    if isinstance(authors, str):
+        authors = authors.split(",")
+    names = []
+    for author in authors:
+        name = author.get_text() if hasattr(author, 'get_text') else author
+        name = " ".join(name.split())
+        # PubMed lists each author twice (short and expanded author lists)
+        if name and name != "N/A" and name not in names:
+            names.append(sys.intern(name))
+    return tuple(names)
+
+
+def normalize_date(citation):
+    """Pull the publication date out of span.cit text as a partial ISO date."""
+    match = date_pattern.search(citation or "")
+    if not match:
+        return ""
+    year, month, day = match.groups()
+    month = MONTHS.get(month.lower()) if month else None
+    if not month:
+        return year
+    if not day:
+        return f"{year}-{month:02d}"
+    return f"{year}-{month:02d}-{int(day):02d}"
+
+
+def article_from_sections(key, title, url, authors, publication_date, sections):
+    """Build an ArticleRecord from the values the scrapers print and the sections dict."""
+    return ArticleRecord(
+        key=key,
+        title=title,
+        url=url or "",
+        authors=parse_authors(authors),
+        publication_date=normalize_date(publication_date),
+        sections=tuple(SectionRecord(label, text) for label, text in sections.items() if text),
+    )
+
+
+class ArticleBatch:
+    """Column-oriented store for many ArticleRecords.
+
+    Titles, URLs and section texts are still one str each, but there are no
+    per-article record, tuple or dict objects. Authors and sections live in
+    flat lists with array offsets per article. Author names, dates and
+    section labels are interned, and labels are stored as indexes into a
+    label table. Records are rebuilt on access.
+    """
+
+    def __init__(self, records=()):
+        self.keys = []
+        self.titles = []
+        self.urls = []
+        self.dates = []
+        self.author_names = []
+        self.author_offsets = array('I', [0])
+        self.labels = []
+        self.label_ids = {}
+        self.section_label_ids = array('H')
+        self.section_texts = []
+        self.section_offsets = array('I', [0])
+        self.extend(records)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("article index out of range")
+        author_start, author_end = self.author_offsets[index], self.author_offsets[index + 1]
+        section_start, section_end = self.section_offsets[index], self.section_offsets[index + 1]
+        sections = tuple(
+            SectionRecord(self.labels[self.section_label_ids[i]], self.section_texts[i])
+            for i in range(section_start, section_end)
+        )
+        return ArticleRecord(
+            key=self.keys[index],
+            title=self.titles[index],
+            url=self.urls[index],
+            authors=tuple(self.author_names[author_start:author_end]),
+            publication_date=self.dates[index],
+            sections=sections,
+        )
+
+    def label_id(self, label):
+        if label not in self.label_ids:
+            if len(self.labels) >= MAX_SECTION_LABELS:
+                raise ValueError(f"Too many distinct section labels (max {MAX_SECTION_LABELS})")
+            self.label_ids[label] = len(self.labels)
+            self.labels.append(sys.intern(label))
+        return self.label_ids[label]
+
+    def append(self, record):
+        # Look labels up first so a failure can't leave the columns out of step
+        label_ids = [self.label_id(section.label) for section in record.sections]
+        self.keys.append(record.key)
+        self.titles.append(record.title)
+        self.urls.append(record.url)
+        self.dates.append(sys.intern(record.publication_date))
+        self.author_names.extend(sys.intern(name) for name in record.authors)
+        self.author_offsets.append(len(self.author_names))
+        self.section_label_ids.extend(label_ids)
+        self.section_texts.extend(section.text for section in record.sections)
+        self.section_offsets.append(len(self.section_texts))
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def extend_batch(self, other, indexes=None):
+        """Append rows of another batch column by column, without building records."""
+        if indexes is None:
+            indexes = range(len(other))
+        label_map = [self.label_id(label) for label in other.labels]
+        for index in indexes:
+            author_start, author_end = other.author_offsets[index], other.author_offsets[index + 1]
+            section_start, section_end = other.section_offsets[index], other.section_offsets[index + 1]
+            self.keys.append(other.keys[index])
+            self.titles.append(other.titles[index])
+            self.urls.append(other.urls[index])
+            self.dates.append(other.dates[index])
+            self.author_names.extend(other.author_names[author_start:author_end])
+            self.author_offsets.append(len(self.author_names))
+            self.section_label_ids.extend(label_map[label_id] for label_id in other.section_label_ids[section_start:section_end])
+            self.section_texts.extend(other.section_texts[section_start:section_end])
+            self.section_offsets.append(len(self.section_texts))
+
+    def merged(self, other, removed_keys=()):
+        """Return a new batch of this batch's rows followed by other's, where other wins on matching keys.
+
+        Rows of this batch whose key is in removed_keys are dropped.
+        """
+        replaced = set(other.keys).union(removed_keys)
+        batch = ArticleBatch()
+        batch.extend_batch(self, [index for index, key in enumerate(self.keys) if key not in replaced])
+        batch.extend_batch(other)
+        return batch
+
+    def to_dict(self):
+        return {
+            "format_version": BATCH_FORMAT_VERSION,
+            "keys": self.keys,
+            "titles": self.titles,
+            "urls": self.urls,
+            "dates": self.dates,
+            "author_names": self.author_names,
+            "author_offsets": self.author_offsets.tolist(),
+            "labels": self.labels,
+            "section_label_ids": self.section_label_ids.tolist(),
+            "section_texts": self.section_texts,
+            "section_offsets": self.section_offsets.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("format_version") != BATCH_FORMAT_VERSION:
+            raise ValueError(f"Unsupported article batch format: {data.get('format_version')}")
+        batch = cls()
+        batch.keys = data["keys"]
+        batch.titles = data["titles"]
+        batch.urls = data["urls"]
+        batch.dates = [sys.intern(date) for date in data["dates"]]
+        batch.author_names = [sys.intern(name) for name in data["author_names"]]
+        batch.author_offsets = array('I', data["author_offsets"])
+        batch.labels = [sys.intern(label) for label in data["labels"]]
+        batch.label_ids = {label: i for i, label in enumerate(batch.labels)}
+        batch.section_label_ids = array('H', data["section_label_ids"])
+        batch.section_texts = data["section_texts"]
+        batch.section_offsets = array('I', data["section_offsets"])
+        return batch
+
+    def save(self, path):
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
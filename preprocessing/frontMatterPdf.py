@@ -0,0 +1,57 @@
+import sys
+from contextlib import closing
+
+from readAndParsePdf import find_sections, section_pattern_with_colon
+from tieredPdfExtract import iter_pages
+
+FRONT_MATTER_SECTIONS = ("ABSTRACT", "OBJECTIVE", "BACKGROUND")
+# Headers that mean the front matter is over even if some wanted sections never showed up
+BODY_SECTIONS = ("INTRODUCTION", "METHOD", "METHODS", "RESULT", "RESULTS", "DISCUSSION", "CONCLUSION", "REFERENCE", "REFERENCES")
+DEFAULT_PAGE_BUDGET = 3
+
+
+def front_matter_pages(pdf_path, wanted, page_budget):
+    """Yield page text until every wanted section has been closed by a later header."""
+    seen = set()
+    open_section = None
+    with closing(iter_pages(pdf_path, max_pages=page_budget)) as pages:
+        for page_number, text, engine, issues in pages:
+            yield text
+
+            done = False
+            for line in text.split('\n'):
+                header_match = section_pattern_with_colon.match(line.strip())
+                if not header_match:
+                    continue
+                header = header_match.group(1).upper()
+                if header in wanted:
+                    seen.add(header)
+                    open_section = header
+                    done = False
+                elif seen:
+                    open_section = None
+                    done = seen == wanted or header in BODY_SECTIONS
+            if done and open_section is None:
+                print(f"Front matter complete after page {page_number}")
+                return
+
+
+def extract_front_matter(pdf_path, sections=FRONT_MATTER_SECTIONS, page_budget=DEFAULT_PAGE_BUDGET):
+    """Run find_sections over only the first pages of a PDF.
+
+    Pages are extracted lazily and extraction stops as soon as the requested
+    sections have all ended, or after page_budget pages. Returns the same dict
+    as find_sections, limited to the requested sections.
+    """
+    wanted = {section.upper() for section in sections}
+    found = find_sections(front_matter_pages(pdf_path, wanted, page_budget))
+    return {section: text for section, text in found.items() if section in wanted}
+
+
+if __name__ == "__main__":
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else "Sample_Paper.pdf"
+    page_budget = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PAGE_BUDGET
+    front_matter = extract_front_matter(pdf_path, page_budget=page_budget)
+    for section_name, section_text in front_matter.items():
+        print(f"### {section_name} ###\n")
+        print(section_text + "\n")
@@ -0,0 +1,143 @@
+import cProfile
+import hashlib
+import os
+import re
+import time
+from contextlib import contextmanager
+
+# Profiling is off unless this points at a directory for dumps and reports.
+# It is an environment variable so reprocessCorpus.py worker processes inherit it.
+PROFILE_ENV = "REU_PROFILE"
+# Only every Nth document gets a cProfile trace; stage timings are always kept
+SAMPLE_ENV = "REU_PROFILE_SAMPLE"
+REPORT_NAME = "profile_report.txt"
+
+document_timings = {}
+_current_documents = []
+_document_count = 0
+
+
+def enabled():
+    return bool(os.environ.get(PROFILE_ENV))
+
+
+def enable(dump_dir, sample_every=1):
+    os.environ[PROFILE_ENV] = dump_dir
+    os.environ[SAMPLE_ENV] = str(sample_every)
+
+
+def profile_dir():
+    directory = os.environ[PROFILE_ENV]
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def dump_path(doc_id):
+    # Basename keeps dumps readable, the hash of the full doc_id keeps them unique
+    base_name = os.path.basename(doc_id.rstrip("/\\")) or doc_id
+    base_name = re.sub(r'[^A-Za-z0-9._-]+', "_", base_name).strip("._")
+    doc_hash = hashlib.sha1(doc_id.encode('utf-8')).hexdigest()[:10]
+    return os.path.join(profile_dir(), f"{base_name[-100:]}-{doc_hash}.prof")
+
+
+@contextmanager
+def document(doc_id):
+    """Time everything done for one article or PDF under doc_id.
+
+    Sampled documents are also traced with cProfile and dumped to
+    <REU_PROFILE>/<basename>-<hash>.prof (see dump_path), where basename is
+    the end of doc_id's last path component and hash is the start of its
+    SHA-1. pstats, snakeviz, gprof2dot and flameprof can all read the dumps.
+    Nested calls count toward the outer document.
+    """
+    global _document_count
+    if not enabled() or _current_documents:
+        yield
+        return
+
+    _document_count += 1
+    sample_every = max(int(os.environ.get(SAMPLE_ENV, "1")), 1)
+    profiler = None
+    if _document_count % sample_every == 0:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler (e.g. python -m cProfile) is already active
+            profiler = None
+
+    timings = document_timings.setdefault(doc_id, {})
+    _current_documents.append(doc_id)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings["total"] = timings.get("total", 0.0) + time.perf_counter() - start
+        _current_documents.pop()
+        if profiler:
+            profiler.disable()
+            try:
+                profiler.dump_stats(dump_path(doc_id))
+            except OSError as e:
+                print(f"Failed to write profile for {doc_id}: {e}")
+
+
+@contextmanager
+def stage(name):
+    """Add the time spent in this block to the current document's stage total."""
+    if not enabled() or not _current_documents:
+        yield
+        return
+
+    timings = document_timings[_current_documents[-1]]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+
+def pop_timings():
+    """Return and clear the timings collected in this process."""
+    timings = dict(document_timings)
+    document_timings.clear()
+    return timings
+
+
+def merge_timings(timings):
+    for doc_id, stages in timings.items():
+        merged = document_timings.setdefault(doc_id, {})
+        for name, seconds in stages.items():
+            merged[name] = merged.get(name, 0.0) + seconds
+
+
+def write_report(path=None, top=25):
+    """Write the slowest documents and stages, ranked by time, to a text report."""
+    if path is None:
+        path = os.path.join(profile_dir(), REPORT_NAME)
+
+    documents = sorted(document_timings.items(), key=lambda item: item[1].get("total", 0.0), reverse=True)
+    stage_totals = {}
+    for doc_id, stages in documents:
+        for name, seconds in stages.items():
+            if name != "total":
+                stage_totals[name] = stage_totals.get(name, 0.0) + seconds
+    overall = sum(stages.get("total", 0.0) for doc_id, stages in documents)
+    median = documents[len(documents) // 2][1].get("total", 0.0) if documents else 0.0
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"Profiled {len(documents)} documents in {overall:.2f}s (median {median:.3f}s)\n\n")
+        f.write("### Stages ###\n\n")
+        for name, seconds in sorted(stage_totals.items(), key=lambda item: item[1], reverse=True):
+            share = seconds / overall * 100 if overall else 0.0
+            f.write(f"{seconds:10.3f}s {share:5.1f}%  {name}\n")
+        f.write(f"\n### Slowest {min(top, len(documents))} documents ###\n\n")
+        for doc_id, stages in documents[:top]:
+            total = stages.get("total", 0.0)
+            ratio = f" ({total / median:.1f}x median)" if median else ""
+            f.write(f"{total:10.3f}s{ratio}  {doc_id}\n")
+            for name, seconds in sorted(stages.items(), key=lambda item: item[1], reverse=True):
+                if name != "total":
+                    f.write(f"{'':14}{seconds:8.3f}s  {name}\n")
+    print(f"Saved profile report to {path}")
+    return path
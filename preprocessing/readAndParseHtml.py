@@ -3,11 +3,19 @@ from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse, parse_qs, urlencode, urlunparse
 import re
 import os
+import json
+
+import profiling
 
 base_url = "https://pubmed.ncbi.nlm.nih.gov"
 search_url = "/?term=(p42es017198[Grant+Number])+OR+(p42+es017198[Grant+Number])&sort=date"
 current_url = base_url + search_url
 
+# Bump whenever extract_sections_from_html changes so reprocessCorpus.py re-runs it
+HTML_PARSER_VERSION = 1
+SECTIONS_DIR = r"C:\Users\tiahi\NSF REU\tokenizing\updated_txts"
+RAW_CORPUS_DIR = r"C:\Users\tiahi\NSF REU\tokenizing\raw_corpus"
+
 def scrape_page(url):
     print("Scraping URL: " + url)
     try:
@@ -16,7 +24,8 @@ def scrape_page(url):
         soup = BeautifulSoup(r.content, "html.parser")
         paper_links = get_paper_links(soup)
         for paper_link in paper_links:
-            extract_and_print_details(paper_link)
+            with profiling.document(paper_link):
+                extract_and_print_details(paper_link)
         next_page_url = get_next_page_url(soup, url)
         if next_page_url:
             scrape_page(next_page_url)
@@ -53,9 +62,11 @@ def get_next_page_url(soup, current_url):
 
 def extract_and_print_details(paper_url):
     try:
-        response = requests.get(paper_url)
+        with profiling.stage("fetch article"):
+            response = requests.get(paper_url)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+        with profiling.stage("BeautifulSoup article"):
+            soup = BeautifulSoup(response.text, 'html.parser')
         title_tag = soup.find('h1', class_='heading-title')
         title = title_tag.text.strip() if title_tag else 'N/A'
         print(f"Article Title: {title}")
@@ -87,17 +98,23 @@ def parse_full_text(full_text_url, paper_title, authors, publication_date):
     }
     
     try:
-        response = requests.get(full_text_url, headers=headers)
+        with profiling.stage("fetch full text"):
+            response = requests.get(full_text_url, headers=headers)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        sections = extract_sections_from_html(soup)
-        save_sections_to_file(paper_title, authors, publication_date, sections)
+        with profiling.stage("save"):
+            save_raw_html(paper_title, authors, publication_date, full_text_url, response.text)
+        with profiling.stage("BeautifulSoup full text"):
+            soup = BeautifulSoup(response.text, 'html.parser')
+        with profiling.stage("extract_sections_from_html"):
+            sections = extract_sections_from_html(soup)
+        with profiling.stage("save"):
+            save_sections_to_file(paper_title, authors, publication_date, sections)
     except requests.RequestException as e:
         print(f"Failed to retrieve the page: {e}")
     except Exception as e:
         print(f"An error occurred while parsing the full text: {e}")
 
-def extract_sections_from_html(soup):
+def extract_sections_from_html(soup, strict=False):
     sections = {
         "Abstract": "",
         "Introduction": "",
@@ -145,15 +162,36 @@ def extract_sections_from_html(soup):
 
     except Exception as e:
         print(f"An error occurred while extracting sections from HTML: {e}")
+        # reprocessCorpus.py needs the failure so the document isn't marked done
+        if strict:
+            raise
 
     return sections
 
-def save_sections_to_file(paper_title, authors, publication_date, sections):
+def save_raw_html(paper_title, authors, publication_date, full_text_url, html, directory=RAW_CORPUS_DIR):
+    # Keep the fetched page and its metadata so sections can be re-parsed offline
     try:
-        paper_title = re.sub(r'[\\/*?:"<>|]', "_", paper_title)
-        directory = r"C:\Users\tiahi\NSF REU\tokenizing\updated_txts"
+        file_stem = re.sub(r'[\\/*?:"<>|]', "_", paper_title)
         os.makedirs(directory, exist_ok=True)
-        file_name = os.path.join(directory, f"{paper_title}_sections.txt")
+        with open(os.path.join(directory, f"{file_stem}.html"), 'w', encoding='utf-8') as f:
+            f.write(html)
+        metadata = {
+            "title": paper_title,
+            "authors": authors,
+            "publication_date": publication_date,
+            "url": full_text_url,
+        }
+        with open(os.path.join(directory, f"{file_stem}.json"), 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False, indent=2)
+    except Exception as e:
+        print(f"An error occurred while saving raw HTML: {e}")
+
+def save_sections_to_file(paper_title, authors, publication_date, sections, directory=SECTIONS_DIR, file_name=None, strict=False):
+    try:
+        paper_title = re.sub(r'[\\/*?:"<>|]', "_", paper_title)
+        if file_name is None:
+            file_name = os.path.join(directory, f"{paper_title}_sections.txt")
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
         with open(file_name, 'w', encoding='utf-8') as f:
             f.write(f"Title: {paper_title}\n")
             f.write(f"Authors: {authors}\n")
@@ -164,7 +202,11 @@ def save_sections_to_file(paper_title, authors, publication_date, sections):
         print(f"Saved sections to {file_name}")
     except Exception as e:
         print(f"An error occurred while saving sections to file: {e}")
+        if strict:
+            raise
 
 
 if __name__ == "__main__":
     scrape_page(current_url)
+    if profiling.enabled():
+        profiling.write_report()
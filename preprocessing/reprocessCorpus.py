@@ -0,0 +1,283 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from bs4 import BeautifulSoup
+
+import articleRecords
+import profiling
+import readAndParseHtml
+import readAndParsePdf
+import tieredPdfExtract
+
+REPROCESSED_DIR = r"C:\Users\tiahi\NSF REU\tokenizing\reprocessed"
+MANIFEST_NAME = "manifest.json"
+INDEX_NAME = "articles.json.gz"
+
+PARSER_EXTENSIONS = {
+    "html": (".html", ".htm"),
+    "pdf": (".pdf",),
+}
+
+
+def parser_versions():
+    return {
+        "html": readAndParseHtml.HTML_PARSER_VERSION,
+        "pdf": readAndParsePdf.PDF_PARSER_VERSION,
+    }
+
+
+def extractor_versions():
+    # PDFs go through the tiered extractor before find_sections, and its output can change too
+    return {
+        "pdf": tieredPdfExtract.EXTRACTOR_VERSION,
+    }
+
+
+def output_version(parser):
+    # Each parser gets its own directory and manifest, so bumping one parser's
+    # version doesn't reprocess documents handled by the others
+    name = f"{parser}-v{parser_versions()[parser]}"
+    if parser in extractor_versions():
+        name += f"-x{extractor_versions()[parser]}"
+    return name
+
+
+def text_cache_dir(output_root):
+    # Extracted PDF text depends only on the extractor, so a find_sections change reuses it
+    return os.path.join(output_root, f"pdf-text-x{tieredPdfExtract.EXTRACTOR_VERSION}")
+
+
+def version_entry(path, parser):
+    entry = {"hash": file_hash(path), "parser": parser, "parser_version": parser_versions()[parser]}
+    if parser in extractor_versions():
+        entry["extractor_version"] = extractor_versions()[parser]
+    return entry
+
+
+def is_unchanged(manifest_entry, entry):
+    # The directory name already pins the versions; comparing them too guards against
+    # a manifest copied between directories. The page report isn't part of the check.
+    return manifest_entry is not None and all(manifest_entry.get(field) == value for field, value in entry.items())
+
+
+def find_raw_documents(raw_dir, parsers):
+    documents = []
+    for root, dirs, files in os.walk(raw_dir):
+        for file_name in sorted(files):
+            extension = os.path.splitext(file_name)[1].lower()
+            for parser in parsers:
+                if extension in PARSER_EXTENSIONS[parser]:
+                    documents.append((os.path.join(root, file_name), parser))
+    return documents
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_metadata(path):
+    # save_raw_html writes the article metadata next to the page as <stem>.json
+    stem = os.path.splitext(path)[0]
+    metadata = {"title": os.path.basename(stem), "authors": "N/A", "publication_date": "N/A"}
+    if os.path.exists(stem + ".json"):
+        with open(stem + ".json", encoding='utf-8') as f:
+            metadata.update(json.load(f))
+    return metadata
+
+
+def output_path(output_dir, key):
+    # Named after the raw file's relative path, extension included, so Paper.html,
+    # Paper.pdf and sub/Paper.html never write to the same output file
+    return os.path.join(output_dir, f"{key}_sections.txt")
+
+
+def text_cache_path(cache_dir, key):
+    return os.path.join(cache_dir, f"{key}.json.gz")
+
+
+def load_pdf_text(path, cache_path, input_hash):
+    """Return (text_by_page, page_report), reusing the cached extraction if the PDF is unchanged."""
+    with profiling.stage("PDF text cache"):
+        try:
+            with gzip.open(cache_path, 'rt', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached["hash"] == input_hash:
+                return cached["text_by_page"], cached["pages"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    text_by_page, page_report = tieredPdfExtract.extract_text_from_pdf(path)
+    with profiling.stage("PDF text cache"):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp_path = cache_path + ".tmp"
+        with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+            json.dump({"hash": input_hash, "text_by_page": text_by_page, "pages": page_report}, f, ensure_ascii=False)
+        os.replace(temp_path, cache_path)
+    return text_by_page, page_report
+
+
+def reprocess_document(path, key, parser, output_dir, input_hash, cache_dir):
+    """Re-run one parser over one cached document. Runs in a worker process.
+
+    Returns the ArticleRecord, the tiered extractor's page report (None for
+    HTML) and this document's profiling timings, which are empty unless
+    profiling is enabled.
+    """
+    with profiling.document(path):
+        metadata = load_metadata(path)
+        page_report = None
+        if parser == "html":
+            with profiling.stage("read"):
+                with open(path, encoding='utf-8') as f:
+                    html = f.read()
+            with profiling.stage("BeautifulSoup full text"):
+                soup = BeautifulSoup(html, 'html.parser')
+            with profiling.stage("extract_sections_from_html"):
+                sections = readAndParseHtml.extract_sections_from_html(soup, strict=True)
+        else:
+            text_by_page, page_report = load_pdf_text(path, text_cache_path(cache_dir, key), input_hash)
+            with profiling.stage("find_sections"):
+                sections = readAndParsePdf.find_sections(text_by_page)
+        with profiling.stage("save"):
+            readAndParseHtml.save_sections_to_file(metadata["title"], metadata["authors"], metadata["publication_date"], sections, file_name=output_path(output_dir, key), strict=True)
+        record = articleRecords.article_from_sections(key, metadata["title"], metadata.get("url"), metadata["authors"], metadata["publication_date"], sections)
+    return record, page_report, profiling.pop_timings()
+
+
+def load_manifest(manifest_path):
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def save_manifest(manifest_path, manifest):
+    temp_path = manifest_path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+
+
+def save_index(index_path, records, removed_keys):
+    # Keep rows for skipped documents from the previous index, keyed like the manifest
+    batch = articleRecords.ArticleBatch(records)
+    if os.path.exists(index_path):
+        batch = articleRecords.ArticleBatch.load(index_path).merged(batch, removed_keys)
+    batch.save(index_path)
+
+
+def prune_removed(manifest, current_keys, output_dir, cache_dir):
+    """Drop manifest entries, outputs and cached text for raw files that no longer exist."""
+    removed_keys = [key for key in manifest if key not in current_keys]
+    for key in removed_keys:
+        del manifest[key]
+        stale_paths = [output_path(output_dir, key)]
+        if cache_dir:
+            stale_paths.append(text_cache_path(cache_dir, key))
+        for stale_path in stale_paths:
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+                # Drop subdirectories left empty, but never the output or cache directory itself
+                parent = os.path.dirname(stale_path)
+                roots = {os.path.abspath(output_dir), os.path.abspath(cache_dir or output_dir)}
+                while os.path.abspath(parent) not in roots and not os.listdir(parent):
+                    os.rmdir(parent)
+                    parent = os.path.dirname(parent)
+    return removed_keys
+
+
+def reprocess_corpus(raw_dir=readAndParseHtml.RAW_CORPUS_DIR, output_root=REPROCESSED_DIR, parsers=("html", "pdf"), workers=None, force=False):
+    """Re-parse every cached raw document into versioned output directories.
+
+    Each parser writes to its own <output_root>/<parser>-v<version>/ (PDFs
+    also carry the extractor version, e.g. pdf-v1-x2) alongside a manifest
+    that records the input hash and versions of each document, plus which
+    engine handled each page of a PDF, and an ArticleBatch index. Documents
+    whose hash matches their parser's manifest are skipped, so bumping one
+    parser's version or changing a raw file is what triggers work. Extracted
+    PDF text is cached per extractor version, so a find_sections change only
+    re-runs section parsing. Files removed from the raw corpus are dropped
+    from the manifest, the outputs and the index.
+    """
+    cache_dir = text_cache_dir(output_root)
+    output_dirs = {}
+    manifests = {}
+    current_keys = {}
+    for parser in parsers:
+        output_dirs[parser] = os.path.join(output_root, output_version(parser))
+        os.makedirs(output_dirs[parser], exist_ok=True)
+        manifests[parser] = load_manifest(os.path.join(output_dirs[parser], MANIFEST_NAME))
+        current_keys[parser] = set()
+
+    pending = {}
+    skipped = 0
+    for path, parser in find_raw_documents(raw_dir, parsers):
+        key = os.path.relpath(path, raw_dir)
+        current_keys[parser].add(key)
+        entry = version_entry(path, parser)
+        if not force and is_unchanged(manifests[parser].get(key), entry):
+            skipped += 1
+            continue
+        pending[path] = (key, entry)
+
+    removed_keys = {}
+    for parser in parsers:
+        parser_cache_dir = cache_dir if parser == "pdf" else None
+        removed_keys[parser] = prune_removed(manifests[parser], current_keys[parser], output_dirs[parser], parser_cache_dir)
+    removed = sum(len(keys) for keys in removed_keys.values())
+
+    print(f"Reprocessing {len(pending)} documents into {', '.join(output_dirs.values())} ({skipped} unchanged, {removed} removed)")
+    failed = 0
+    records = {parser: [] for parser in parsers}
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for path, (key, entry) in pending.items():
+                parser = entry["parser"]
+                future = executor.submit(reprocess_document, path, key, parser, output_dirs[parser], entry["hash"], cache_dir)
+                futures[future] = path
+            for future in as_completed(futures):
+                path = futures[future]
+                key, entry = pending[path]
+                try:
+                    record, page_report, timings = future.result()
+                    records[entry["parser"]].append(record)
+                    profiling.merge_timings(timings)
+                    if page_report is not None:
+                        entry = dict(entry, pages=page_report)
+                    manifests[entry["parser"]][key] = entry
+                except Exception as e:
+                    failed += 1
+                    print(f"Failed to reprocess {key}: {e}")
+    finally:
+        for parser in parsers:
+            save_manifest(os.path.join(output_dirs[parser], MANIFEST_NAME), manifests[parser])
+            save_index(os.path.join(output_dirs[parser], INDEX_NAME), records[parser], removed_keys[parser])
+        if profiling.enabled():
+            profiling.write_report()
+
+    print(f"Done: {len(pending) - failed} reprocessed, {skipped} skipped, {removed} removed, {failed} failed")
+    return output_dirs
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Re-run section parsing over the cached raw HTML/PDF corpus")
+    arg_parser.add_argument("--raw-dir", default=readAndParseHtml.RAW_CORPUS_DIR)
+    arg_parser.add_argument("--output-dir", default=REPROCESSED_DIR)
+    arg_parser.add_argument("--parsers", nargs="+", choices=sorted(PARSER_EXTENSIONS), default=sorted(PARSER_EXTENSIONS))
+    arg_parser.add_argument("--workers", type=int, default=None)
+    arg_parser.add_argument("--force", action="store_true", help="reprocess documents even if unchanged")
+    arg_parser.add_argument("--profile", metavar="DIR", help="time each document and stage and write cProfile dumps to DIR")
+    arg_parser.add_argument("--profile-sample", type=int, default=1, metavar="N", help="only trace every Nth document with cProfile")
+    args = arg_parser.parse_args()
+    if args.profile:
+        profiling.enable(args.profile, args.profile_sample)
+    reprocess_corpus(args.raw_dir, args.output_dir, args.parsers, args.workers, args.force)
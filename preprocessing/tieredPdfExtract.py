@@ -0,0 +1,165 @@
+import re
+import sys
+from contextlib import ExitStack
+
+import PyPDF2
+
+import profiling
+
+# Bump whenever the scoring thresholds or engine choice change so reprocessCorpus.py re-runs PDFs
+EXTRACTOR_VERSION = 2
+
+FAST_ENGINE = "pypdf2"
+LAYOUT_ENGINE = "pdfplumber"
+
+# Pages whose fast-pass text trips any of these checks are re-run with pdfplumber
+MIN_PAGE_CHARS = 200
+MAX_SINGLE_CHAR_WORD_RATIO = 0.25
+MAX_LONG_WORD_RATIO = 0.05
+LONG_WORD_LENGTH = 25
+MAX_FRAGMENT_LINE_RATIO = 0.6
+
+word_pattern = re.compile(r'[A-Za-z]+')
+
+
+def score_page_text(text):
+    """Return a list of quality problems found in a page of fast-pass text."""
+    issues = []
+    stripped = text.strip() if text else ""
+    if not stripped:
+        issues.append("empty")
+        return issues
+    if len(stripped) < MIN_PAGE_CHARS:
+        # Could be a real short page (figure, end of references) or a partial extraction
+        issues.append("short text")
+        return issues
+
+    words = word_pattern.findall(stripped)
+    if words:
+        # "s e c t i o n" style output from glyph-by-glyph text runs
+        single_chars = sum(1 for word in words if len(word) == 1 and word not in ('a', 'A', 'I'))
+        if single_chars / len(words) > MAX_SINGLE_CHAR_WORD_RATIO:
+            issues.append("broken words")
+        # "thesectionwasmissingspaces" style output when word gaps are lost
+        long_words = sum(1 for word in words if len(word) >= LONG_WORD_LENGTH)
+        if long_words / len(words) > MAX_LONG_WORD_RATIO:
+            issues.append("merged words")
+
+    # Interleaved two-column text shows up as lots of one- or two-word lines
+    lines = [line for line in stripped.split('\n') if line.strip()]
+    if lines:
+        fragments = sum(1 for line in lines if len(line.split()) <= 2)
+        if fragments / len(lines) > MAX_FRAGMENT_LINE_RATIO:
+            issues.append("column order")
+
+    return issues
+
+
+def iter_pages(pdf_path, max_pages=None):
+    """Yield (page_number, text, engine, issues) for each page, lazily.
+
+    Every page gets the PyPDF2 text pass first. Only pages that fail
+    score_page_text are re-extracted with pdfplumber, which is opened the first
+    time it is needed and reused for the rest of the document. If pdfplumber
+    fails on a page the fast-pass text is kept and the error is added to that
+    page's issues. A file PyPDF2 cannot open at all is read with pdfplumber.
+    """
+    with ExitStack() as stack:
+        layout_pdf = None
+        layout_open_error = None
+        try:
+            with profiling.stage("PyPDF2 open"):
+                pdf_file = stack.enter_context(open(pdf_path, 'rb'))
+                pdf_reader = PyPDF2.PdfReader(pdf_file)
+                page_count = len(pdf_reader.pages)
+        except Exception as e:
+            print(f"Fast text pass could not open {pdf_path}: {e}")
+            pdf_reader = None
+            fast_open_error = f"PyPDF2 could not open file: {e}"
+            # Nothing to fall back from if pdfplumber can't open it either
+            with profiling.stage("pdfplumber open"):
+                import pdfplumber
+                layout_pdf = stack.enter_context(pdfplumber.open(pdf_path))
+                page_count = len(layout_pdf.pages)
+
+        if max_pages is not None:
+            page_count = min(page_count, max_pages)
+
+        for page_index in range(page_count):
+            text = ""
+            fast_error = None
+            if pdf_reader is None:
+                fast_error = fast_open_error
+            else:
+                try:
+                    with profiling.stage("PyPDF2 extract_text"):
+                        text = pdf_reader.pages[page_index].extract_text() or ""
+                except Exception as e:
+                    print(f"Fast text pass failed on page {page_index + 1}: {e}")
+                    fast_error = f"PyPDF2 error: {e}"
+
+            with profiling.stage("score_page_text"):
+                issues = score_page_text(text)
+            if fast_error:
+                issues.append(fast_error)
+            engine = FAST_ENGINE
+            if issues and layout_open_error:
+                issues.append(layout_open_error)
+            elif issues:
+                try:
+                    if layout_pdf is None:
+                        with profiling.stage("pdfplumber open"):
+                            import pdfplumber
+                            layout_pdf = stack.enter_context(pdfplumber.open(pdf_path))
+                except Exception as e:
+                    print(f"Layout extractor could not open {pdf_path}: {e}")
+                    layout_open_error = f"pdfplumber could not open file: {e}"
+                    issues.append(layout_open_error)
+                else:
+                    try:
+                        with profiling.stage("pdfplumber extract_text"):
+                            layout_page = layout_pdf.pages[page_index]
+                            layout_text = layout_page.extract_text(x_tolerance=1, y_tolerance=1)
+                            # pdfplumber keeps parsed layout objects around on each page
+                            layout_page.flush_cache()
+                        if layout_text:
+                            text = layout_text
+                            engine = LAYOUT_ENGINE
+                    except Exception as e:
+                        print(f"Layout extractor failed on page {page_index + 1}: {e}")
+                        issues.append(f"pdfplumber error: {e}")
+
+            yield page_index + 1, text, engine, issues
+
+
+def extract_text_from_pdf(pdf_path):
+    """Extract text page by page, returning (text_by_page, page_report).
+
+    text_by_page has the same shape as readAndParsePdf.extract_text_from_pdf so
+    it can be passed straight to find_sections. page_report has one entry per
+    page recording which engine produced the text and why.
+    """
+    text_by_page = []
+    page_report = []
+    for page_number, text, engine, issues in iter_pages(pdf_path):
+        if text:
+            text_by_page.append(text)
+        page_report.append({"page": page_number, "engine": engine, "issues": issues})
+    return text_by_page, page_report
+
+
+def print_page_report(page_report):
+    layout_pages = [entry["page"] for entry in page_report if entry["engine"] == LAYOUT_ENGINE]
+    for entry in page_report:
+        issues = ", ".join(entry["issues"]) if entry["issues"] else "ok"
+        print(f"Page {entry['page']}: {entry['engine']} ({issues})")
+    print(f"{len(layout_pages)} of {len(page_report)} pages needed {LAYOUT_ENGINE}")
+
+
+if __name__ == "__main__":
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else "Sample_Paper.pdf"
+    with profiling.document(pdf_path):
+        text_by_page, page_report = extract_text_from_pdf(pdf_path)
+    print_page_report(page_report)
+    if profiling.enabled():
+        profiling.write_report()